@@ -1,48 +1,33 @@
-import re
+import app_cache
+from patch_utils import find_spans, object_entry_spans, splice
 
-file_path = 'src/App.jsx'
-
-with open(file_path, 'r', encoding='utf-8') as f:
-    content = f.read()
-
-# 1. Add to THERAPEUTIC_RANGES
-ranges_insert = """    label: 'Analgesia (4.0-15.0)'
-  },
-  'Methadone': {
+# 1-3. New entries for the per-drug tables, appended after each table's
+# last property so they don't depend on how the existing entries look
+ranges_entry = """  'Methadone': {
     analgesiaMin: 50,
     analgesiaMax: 100,
     respiratoryRisk: 200, 
     label: 'Analgesia (50-100) / Resp Risk > 200'
-  }
-};"""
-content = content.replace("    label: 'Analgesia (4.0-15.0)'\n  }\n};", ranges_insert)
-
-# 2. Add to CLINICAL_DEFAULTS
-defaults_insert = """  'Morphine': { bolus: 5, rate: 2, duration: 120, unit: 'mg' },
-  'Hydromorphone': { bolus: 1, rate: 0.5, duration: 120, unit: 'mg' },
-  'Methadone': { bolus: 5, rate: 2, duration: 60, unit: 'mg' }
-};"""
-content = content.replace("  'Morphine': { bolus: 5, rate: 2, duration: 120, unit: 'mg' },\n  'Hydromorphone': { bolus: 1, rate: 0.5, duration: 120, unit: 'mg' }\n};", defaults_insert)
-
-# 3. Add to AVAILABLE_MODELS
-models_insert = """  'Morphine': ['Maitre (Adult)', 'McFarlan (Pediatric)'],
-  'Hydromorphone': ['Jeleazcov (2014) Adult', 'Balyan (2020) Pediatric', 'Standard (Adult)', 'Pediatric (Scaled)'],
-  'Methadone': ['Standard (Adult)']
-};"""
-content = content.replace("  'Morphine': ['Maitre (Adult)', 'McFarlan (Pediatric)'],\n  'Hydromorphone': ['Jeleazcov (2014) Adult', 'Balyan (2020) Pediatric', 'Standard (Adult)', 'Pediatric (Scaled)']\n};", models_insert)
+  }"""
+defaults_entry = "  'Methadone': { bolus: 5, rate: 2, duration: 60, unit: 'mg' }"
+models_entry = "  'Methadone': ['Standard (Adult)']"
+
+TABLE_ENTRIES = [
+    ('THERAPEUTIC_RANGES', ranges_entry),
+    ('CLINICAL_DEFAULTS', defaults_entry),
+    ('AVAILABLE_MODELS', models_entry),
+]
 
 # 4. Update getModelRequirements
 req_insert = """  if (drug === 'Fentanyl' && model.includes('Shafer')) return [];
   if (drug === 'Methadone') return ['weight'];
   return ['weight'];"""
-content = content.replace("  if (drug === 'Fentanyl' && model.includes('Shafer')) return [];\n  return ['weight'];", req_insert)
 
 # 5. Update getBestModel
 best_insert = """  if (drug === 'Morphine') return isPeds ? 'McFarlan (Pediatric)' : 'Maitre (Adult)';
   if (drug === 'Hydromorphone') return isPeds ? 'Balyan (2020) Pediatric' : 'Jeleazcov (2014) Adult';
   if (drug === 'Methadone') return 'Standard (Adult)';
   return 'Bae (2020) Adult';"""
-content = content.replace("  if (drug === 'Morphine') return isPeds ? 'McFarlan (Pediatric)' : 'Maitre (Adult)';\n  if (drug === 'Hydromorphone') return isPeds ? 'Balyan (2020) Pediatric' : 'Jeleazcov (2014) Adult';\n  return 'Bae (2020) Adult';", best_insert)
 
 # 6. Update getPKParameters
 pk_insert = """      params.V1 = 3.35 * wRatio; params.V2 = 13.9 * wRatio; params.V3 = 145.0 * wRatio; params.Cl = 1.01 * (wRatio ** 0.75); params.Q2 = 1.47 * (wRatio ** 0.75); params.Q3 = 1.41 * (wRatio ** 0.75); params.ke0 = 0.02;
@@ -61,14 +46,12 @@ pk_insert = """      params.V1 = 3.35 * wRatio; params.V2 = 13.9 * wRatio; param
      params.Q3 = (136.0 / 60) * (wRatio ** 0.75);
      params.ke0 = 0.05; // Estimated, slow equilibration
   }"""
-content = content.replace("      params.V1 = 3.35 * wRatio; params.V2 = 13.9 * wRatio; params.V3 = 145.0 * wRatio; params.Cl = 1.01 * (wRatio ** 0.75); params.Q2 = 1.47 * (wRatio ** 0.75); params.Q3 = 1.41 * (wRatio ** 0.75); params.ke0 = 0.02;\n    }\n  }", pk_insert)
 
 # 7. Update simulateConcentration scaling
 scale_insert = """  const k31 = (V3 > 0) ? Q3 / V3 : 0;
 
   const isMgDrug = drugType === 'Morphine' || drugType === 'Hydromorphone' || drugType === 'Methadone';
   const scaleFactor = isMgDrug ? 1000 : 1;"""
-content = content.replace("  const k31 = (V3 > 0) ? Q3 / V3 : 0;\n\n  const isMgDrug = drugType === 'Morphine' || drugType === 'Hydromorphone';\n  const scaleFactor = isMgDrug ? 1000 : 1;", scale_insert)
 
 # 8. Update UI Dropdown
 ui_insert = """                    <option value="Remifentanil">Remifentanil (mcg)</option>
@@ -76,7 +59,6 @@ ui_insert = """                    <option value="Remifentanil">Remifentanil (mc
                     <option value="Hydromorphone">Hydromorphone (mg)</option>
                     <option value="Methadone">Methadone (mg)</option>
                   </select>"""
-content = content.replace('                    <option value="Remifentanil">Remifentanil (mcg)</option>\n                    <option value="Morphine">Morphine (mg)</option>\n                    <option value="Hydromorphone">Hydromorphone (mg)</option>\n                  </select>', ui_insert)
 
 # 9. Update UI Model Dropdown
 model_ui_insert = """                      <option>Standard (Adult)</option>
@@ -86,9 +68,42 @@ model_ui_insert = """                      <option>Standard (Adult)</option>
                       <option>Standard (Adult)</option>
                     </>}
                   </select>"""
-content = content.replace('                      <option>Standard (Adult)</option>\n                      <option>Pediatric (Scaled)</option>\n                    </>}\n                  </select>', model_ui_insert)
 
-with open(file_path, 'w', encoding='utf-8') as f:
-    f.write(content)
 
-print("Successfully updated App.jsx with Methadone support")
+PATCHES = [
+    # 4. Update getModelRequirements
+    ("  if (drug === 'Fentanyl' && model.includes('Shafer')) return [];\n  return ['weight'];", req_insert, "if (drug === 'Methadone') return ['weight'];"),
+
+    # 5. Update getBestModel
+    ("  if (drug === 'Morphine') return isPeds ? 'McFarlan (Pediatric)' : 'Maitre (Adult)';\n  if (drug === 'Hydromorphone') return isPeds ? 'Balyan (2020) Pediatric' : 'Jeleazcov (2014) Adult';\n  return 'Bae (2020) Adult';", best_insert, "if (drug === 'Methadone') return 'Standard (Adult)';"),
+
+    # 6. Update getPKParameters
+    ("      params.V1 = 3.35 * wRatio; params.V2 = 13.9 * wRatio; params.V3 = 145.0 * wRatio; params.Cl = 1.01 * (wRatio ** 0.75); params.Q2 = 1.47 * (wRatio ** 0.75); params.Q3 = 1.41 * (wRatio ** 0.75); params.ke0 = 0.02;\n    }\n  }", pk_insert, "else if (drug === 'Methadone') {"),
+
+    # 7. Update simulateConcentration scaling
+    ("  const k31 = (V3 > 0) ? Q3 / V3 : 0;\n\n  const isMgDrug = drugType === 'Morphine' || drugType === 'Hydromorphone';\n  const scaleFactor = isMgDrug ? 1000 : 1;", scale_insert),
+
+    # 8. Update UI Dropdown
+    ('                    <option value="Remifentanil">Remifentanil (mcg)</option>\n                    <option value="Morphine">Morphine (mg)</option>\n                    <option value="Hydromorphone">Hydromorphone (mg)</option>\n                  </select>', ui_insert, '<option value="Methadone">'),
+
+    # 9. Update UI Model Dropdown
+    ('                      <option>Standard (Adult)</option>\n                      <option>Pediatric (Scaled)</option>\n                    </>}\n                  </select>', model_ui_insert, "{drug === 'Methadone' && <>"),
+]
+
+
+def plan_methadone(content):
+    spans = find_spans(content, PATCHES)
+    for name, entry in TABLE_ENTRIES:
+        spans += object_entry_spans(content, name, entry)
+    return spans
+
+
+def apply_methadone(content):
+    return splice(content, plan_methadone(content))
+
+
+if __name__ == '__main__':
+    app_cache.set(apply_methadone(app_cache.get()))
+    app_cache.flush()
+
+    print("Successfully updated App.jsx with Methadone support")
@@ -0,0 +1,69 @@
+import mmap
+import os
+
+file_path = 'src/App.jsx'
+
+# App.jsx is loaded on first access and kept in memory, so chained
+# transforms share one read and one write.
+_content = None
+_original = None
+
+
+def map_file(path):
+    # Map the file read-only instead of reading it into a bytes object: the
+    # kernel pages it in as the anchor lookups (mmap.find, regex) scan it.
+    # Slicing the map, as splice does, yields ordinary bytes.
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if os.fstat(fd).st_size == 0:
+            return b''
+        return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fd)
+
+
+def spit(path, data):
+    data = memoryview(data)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+
+def get():
+    global _content, _original
+    if _content is None:
+        # Kept as raw bytes: no UTF-8 decode on the way in or encode on the
+        # way out, and the file's CRLF line endings survive untouched.
+        _content = _original = map_file(file_path)
+    return _content
+
+
+def set(content):
+    global _content
+    _content = content
+
+
+def close():
+    # Drop the cached copy and unmap the file. Windows won't truncate a file
+    # while a view of it is mapped, so this has to happen before any write.
+    global _content, _original
+    if isinstance(_original, mmap.mmap):
+        _original.close()
+    _content = _original = None
+
+
+def flush():
+    # Nothing to write if no transform changed the file, e.g. on a re-run
+    # where every patch is already applied. Transforms that make no edits
+    # hand back the same object, so usually the identity check is enough.
+    # Either way the mapping is released; a later get() maps the file anew.
+    content = _content
+    changed = content is not None and content is not _original and not (
+        len(content) == len(_original) and content == _original[:]
+    )
+    close()
+    if changed:
+        spit(file_path, content)
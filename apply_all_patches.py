@@ -0,0 +1,29 @@
+import app_cache
+from add_methadone import plan_methadone
+from fix_layout_and_locales import plan_layout
+from implement_clock_mode import plan_clock_mode
+from implement_realtime import plan_realtime
+from patch_utils import splice
+from update_app import plan_i18n
+
+# Transforms in the same stage don't depend on each other's output, so their
+# spans are all resolved against the same content and spliced in one pass.
+# Clock mode anchors on the i18n'd time axis label and the real-time
+# indicator anchors on the clock mode state, hence the later stages.
+STAGES = [
+    [plan_i18n, plan_methadone, plan_layout],
+    [plan_clock_mode],
+    [plan_realtime],
+]
+
+if __name__ == '__main__':
+    for stage in STAGES:
+        content = app_cache.get()
+        spans = []
+        for plan in stage:
+            spans += plan(content)
+        app_cache.set(splice(content, spans))
+
+    app_cache.flush()
+
+    print("Successfully applied all patches to App.jsx")
@@ -1,9 +1,5 @@
-import re
-
-file_path = 'src/App.jsx'
-
-with open(file_path, 'r', encoding='utf-8') as f:
-    content = f.read()
+import app_cache
+from patch_utils import find_spans, splice
 
 # 1. Insert Helpers
 helpers_code = """
@@ -24,13 +20,10 @@ const minutesToTime = (minutes, startStr) => {
   return `${String(h).padStart(2, '0')}:${String(m).padStart(2, '0')}`;
 };
 """
-# Insert before 'const calculateLBM'
-content = content.replace("const calculateLBM", helpers_code + "\nconst calculateLBM")
 
 # 2. Insert State
 state_code = """  const [isClockMode, setIsClockMode] = useState(false);
   const [startTime, setStartTime] = useState("09:00");"""
-content = content.replace("const [isAutoY, setIsAutoY] = useState(true);", "const [isAutoY, setIsAutoY] = useState(true);\n" + state_code)
 
 # 3. Insert Toggle UI
 toggle_code = """              <label className="flex items-center gap-1 text-xs cursor-pointer select-none bg-slate-200 px-2 py-1 rounded hover:bg-slate-300 transition-colors mr-2">
@@ -53,7 +46,6 @@ toggle_code = """              <label className="flex items-center gap-1 text-xs
                 />
               )}
 """
-content = content.replace('<span className="text-xs font-semibold text-slate-500 whitespace-nowrap">{t(\'timeAxis\')}</span>', '<span className="text-xs font-semibold text-slate-500 whitespace-nowrap">{t(\'timeAxis\')}</span>\n' + toggle_code)
 
 # 4. Update Bolus Input
 bolus_input_old = '<input type="number" min="0" value={bolusTime} onChange={e => setBolusTime(Math.max(0, Number(e.target.value)))} className="w-full border rounded p-2 text-center" />'
@@ -67,7 +59,6 @@ bolus_input_new = """{isClockMode ? (
                     ) : (
                       <input type="number" min="0" value={bolusTime} onChange={e => setBolusTime(Math.max(0, Number(e.target.value)))} className="w-full border rounded p-2 text-center" />
                     )}"""
-content = content.replace(bolus_input_old, bolus_input_new)
 
 # 5. Update Infusion Start Input
 infusion_start_old = '<input type="number" min="0" value={infusionStartTime} onChange={e => setInfusionStartTime(Math.max(0, Number(e.target.value)))} className="w-full border rounded p-2 text-center" />'
@@ -81,7 +72,6 @@ infusion_start_new = """{isClockMode ? (
                     ) : (
                       <input type="number" min="0" value={infusionStartTime} onChange={e => setInfusionStartTime(Math.max(0, Number(e.target.value)))} className="w-full border rounded p-2 text-center" />
                     )}"""
-content = content.replace(infusion_start_old, infusion_start_new)
 
 # 6. Update Chart XAxis
 xaxis_old = """                <XAxis
@@ -99,7 +89,6 @@ xaxis_new = """                <XAxis
                   allowDataOverflow
                   tickFormatter={(val) => isClockMode ? minutesToTime(val, startTime) : val}
                 />"""
-content = content.replace(xaxis_old, xaxis_new)
 
 # 7. Update Tooltip
 tooltip_old = """                <Tooltip
@@ -110,9 +99,42 @@ tooltip_new = """                <Tooltip
                   labelFormatter={(v) => isClockMode ? `${minutesToTime(v, startTime)} (${v} min)` : `${v} min`}
                   contentStyle={{ fontSize: '12px', borderRadius: '8px' }}
                 />"""
-content = content.replace(tooltip_old, tooltip_new)
 
-with open(file_path, 'w', encoding='utf-8') as f:
-    f.write(content)
 
-print("Successfully implemented Clock Mode in App.jsx")
+PATCHES = [
+    # 1. Insert Helpers before 'const calculateLBM'
+    ("const calculateLBM", helpers_code + "\nconst calculateLBM", 'const timeToMinutes ='),
+
+    # 2. Insert State
+    ("const [isAutoY, setIsAutoY] = useState(true);", "const [isAutoY, setIsAutoY] = useState(true);\n" + state_code, 'const [isClockMode, setIsClockMode]'),
+
+    # 3. Insert Toggle UI
+    ('<span className="text-xs font-semibold text-slate-500 whitespace-nowrap">{t(\'timeAxis\')}</span>', '<span className="text-xs font-semibold text-slate-500 whitespace-nowrap">{t(\'timeAxis\')}</span>\n' + toggle_code, "{t('clockMode')}"),
+
+    # 4. Update Bolus Input
+    (bolus_input_old, bolus_input_new, 'setBolusTime(timeToMinutes('),
+
+    # 5. Update Infusion Start Input
+    (infusion_start_old, infusion_start_new, 'setInfusionStartTime(timeToMinutes('),
+
+    # 6. Update Chart XAxis
+    (xaxis_old, xaxis_new),
+
+    # 7. Update Tooltip
+    (tooltip_old, tooltip_new),
+]
+
+
+def plan_clock_mode(content):
+    return find_spans(content, PATCHES)
+
+
+def apply_clock_mode(content):
+    return splice(content, plan_clock_mode(content))
+
+
+if __name__ == '__main__':
+    app_cache.set(apply_clock_mode(app_cache.get()))
+    app_cache.flush()
+
+    print("Successfully implemented Clock Mode in App.jsx")
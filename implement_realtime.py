@@ -1,9 +1,5 @@
-import re
-
-file_path = 'src/App.jsx'
-
-with open(file_path, 'r', encoding='utf-8') as f:
-    content = f.read()
+import app_cache
+from patch_utils import find_spans, splice
 
 # 1. Add State for Current Time
 state_insert = """  const [startTime, setStartTime] = useState("09:00");
@@ -14,7 +10,6 @@ state_insert = """  const [startTime, setStartTime] = useState("09:00");
     const timer = setInterval(() => setCurrentTime(new Date()), 60000); // Update every minute
     return () => clearInterval(timer);
   }, []);"""
-content = content.replace('  const [startTime, setStartTime] = useState("09:00");', state_insert)
 
 # 2. Add Calculation Logic
 calc_insert = """  // --- REAL-TIME CALCULATION ---
@@ -39,7 +34,6 @@ calc_insert = """  // --- REAL-TIME CALCULATION ---
     return point || null;
   }, [currentSimMinutes, simData]);
 """
-content = content.replace('  // --- EFFECT: Auto-Fill Stats on Age Change ---', calc_insert + '\n  // --- EFFECT: Auto-Fill Stats on Age Change ---')
 
 # 3. Add ReferenceLine and Label to Chart
 # We insert this inside LineChart, before Tooltip
@@ -48,7 +42,6 @@ chart_insert = """                {isClockMode && currentSimMinutes !== null &&
                 )}
                 
                 <Tooltip"""
-content = content.replace('<Tooltip', chart_insert)
 
 # 4. Add Status Box Overlay
 # We insert this after ResponsiveContainer closing tag
@@ -67,9 +60,33 @@ overlay_insert = """            </ResponsiveContainer>
               </div>
             )}
           </div>"""
-content = content.replace('            </ResponsiveContainer>\n          </div>', overlay_insert)
 
-with open(file_path, 'w', encoding='utf-8') as f:
-    f.write(content)
 
-print("Successfully implemented Real-time Indicator in App.jsx")
+PATCHES = [
+    # 1. Add State for Current Time
+    ('  const [startTime, setStartTime] = useState("09:00");', state_insert, 'const [currentTime, setCurrentTime]'),
+
+    # 2. Add Calculation Logic
+    ('  // --- EFFECT: Auto-Fill Stats on Age Change ---', calc_insert + '\n  // --- EFFECT: Auto-Fill Stats on Age Change ---', 'const currentSimMinutes = useMemo'),
+
+    # 3. Add ReferenceLine and Label to Chart
+    ('<Tooltip', chart_insert, '<ReferenceLine x={currentSimMinutes}'),
+
+    # 4. Add Status Box Overlay
+    ('            </ResponsiveContainer>\n          </div>', overlay_insert, 'isClockMode && currentValues &&'),
+]
+
+
+def plan_realtime(content):
+    return find_spans(content, PATCHES)
+
+
+def apply_realtime(content):
+    return splice(content, plan_realtime(content))
+
+
+if __name__ == '__main__':
+    app_cache.set(apply_realtime(app_cache.get()))
+    app_cache.flush()
+
+    print("Successfully implemented Real-time Indicator in App.jsx")
@@ -0,0 +1,80 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Text and contents of each locale file as last loaded or saved, so that
+# save_locale can patch the text without reading the file again.
+_loaded = {}
+
+
+def load_locale(file_path):
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+
+    data = json.loads(text)
+    _loaded[file_path] = (text, dict(data))
+    return data
+
+
+def save_locale(file_path, data):
+    text, saved = _loaded.get(file_path, ('', None))
+    if data == saved:
+        return
+
+    newline = '\r\n' if '\r\n' in text else '\n'
+    if saved is not None and all(k in data and data[k] == v for k, v in saved.items()):
+        # Only new keys: rewrite just the end of the file in place, from
+        # the last existing entry onwards, so the write is the size of the
+        # new keys rather than the whole document.
+        closing = text.rindex('}')
+        body = text[:closing].rstrip()
+        entries = ','.join(
+            f'{newline}    {json.dumps(k, ensure_ascii=False)}: {json.dumps(v, ensure_ascii=False)}'
+            for k, v in data.items() if k not in saved
+        )
+        separator = '' if body.endswith('{') else ','
+        tail = separator + entries + newline + text[closing:]
+        with open(file_path, 'r+b') as f:
+            f.seek(-len(text[len(body):].encode('utf-8')), os.SEEK_END)
+            f.write(tail.encode('utf-8'))
+            # The old tail can be longer than the new one, e.g. when there
+            # was a run of whitespace before the closing brace.
+            f.truncate()
+        _loaded[file_path] = (body + tail, dict(data))
+        return
+
+    # Serialised up front and handed to a single write()
+    payload = json.dumps(data, indent=4, ensure_ascii=False).replace('\n', newline)
+    with open(file_path, 'w', encoding='utf-8', newline='', buffering=1 << 16) as f:
+        f.write(payload)
+    _loaded[file_path] = (payload, dict(data))
+
+
+def update_locale(file_path, *updates):
+    # Every group of new keys is applied to one in-memory dict, so the file
+    # is read and written once however many groups target it. Nothing is
+    # written when the keys are already there.
+    data = load_locale(file_path)
+    for keys in updates:
+        data.update(keys)
+    save_locale(file_path, data)
+
+
+# Below this many bytes of locale JSON in all, starting worker processes
+# costs more than updating the files one after another. The repo's two
+# ~2 KB files are far below it.
+parallel_min_bytes = 32 << 20
+
+
+def update_locales(keys_by_path):
+    # The locale files don't depend on each other, so large ones are each
+    # updated in their own worker process.
+    if not keys_by_path:
+        return
+    if len(keys_by_path) < 2 or sum(os.path.getsize(path) for path in keys_by_path) < parallel_min_bytes:
+        for path, keys in keys_by_path.items():
+            update_locale(path, keys)
+        return
+    with ProcessPoolExecutor(max_workers=len(keys_by_path)) as executor:
+        list(executor.map(update_locale, keys_by_path, keys_by_path.values()))
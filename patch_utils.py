@@ -0,0 +1,186 @@
+import re
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# content below is bytes, or the read-only mmap app_cache hands out before
+# the first edit. Stick to find/rfind, slicing and regex on it: `in` on an
+# mmap tests for a single byte value, and it has no startswith or index.
+
+# The text handed to the automaton for the content last searched, so that
+# the plans of one stage, which all search the same content, share it.
+_haystack = (None, None)
+
+
+def line_ending(content):
+    first = content.find(b'\n')
+    return b'\r\n' if first > 0 and content[first - 1:first] == b'\r' else b'\n'
+
+
+def encode(text, newline=b'\n'):
+    # Patches are written as str with \n line endings; App.jsx is handled as
+    # bytes, so convert to UTF-8 and to the file's own line endings.
+    return text.encode('utf-8').replace(b'\n', newline)
+
+
+def haystack(content):
+    # Unicode builds of pyahocorasick only take str; latin-1 maps each byte
+    # to one character, so offsets still line up with content. Either way
+    # this is a copy of the whole file, so it is made once per content.
+    global _haystack
+    if _haystack[0] is not content:
+        _haystack = (content, str(content, 'latin-1') if ahocorasick.unicode else bytes(content))
+    return _haystack[1]
+
+
+def find_occurrences(content, needles):
+    # Start offsets of every occurrence of each needle, overlapping ones
+    # included. With pyahocorasick installed they are all found in a single
+    # pass over content by an automaton.
+    found = {needle: [] for needle in needles}
+    if ahocorasick is not None and found:
+        text = haystack(content)
+        automaton = ahocorasick.Automaton()
+        for needle in found:
+            automaton.add_word(needle.decode('latin-1') if ahocorasick.unicode else needle, needle)
+        automaton.make_automaton()
+        for end, needle in automaton.iter(text):
+            found[needle].append(end - len(needle) + 1)
+        return found
+
+    # Otherwise look for each needle in turn. bytes.find and mmap.find run
+    # at memchr speed, so this beats one regex alternation over the file,
+    # which has to try every needle at every offset to report overlapping
+    # occurrences the way the automaton does.
+    for needle, starts in found.items():
+        start = content.find(needle)
+        while start != -1:
+            starts.append(start)
+            start = content.find(needle, start + 1)
+    return found
+
+
+def find_spans(content, patches):
+    # Resolve each (old, new) patch to (start, length, new) spans, one per
+    # non-overlapping occurrence of old -- the same matches str.replace makes.
+    # Earlier patches claim their text first and a later occurrence that
+    # overlaps one of them is skipped, as if the replaces ran in sequence.
+    #
+    # A patch may carry a third element, a marker string whose presence
+    # means the patch was already applied. Insertions around their anchor
+    # (old is part of new) default to new itself as the marker. Applied
+    # patches are skipped, so re-running a script leaves the file alone.
+    newline = line_ending(content)
+    patches = [[encode(part, newline) for part in patch] for patch in patches]
+    found = find_occurrences(content, [patch[0] for patch in patches])
+    spans = []
+    for old, new, *marker in patches:
+        if not found[old]:
+            continue
+        if marker:
+            marker = marker[0]
+        elif old in new:
+            marker = new
+        if marker and content.find(marker) != -1:
+            continue
+        cur = 0
+        for start in found[old]:
+            end = start + len(old)
+            if start < cur or any(s < end and start < s + n for s, n, _ in spans):
+                continue
+            spans.append((start, len(old), new))
+            cur = end
+    return spans
+
+
+def splice(content, spans):
+    # Rebuild content in one pass instead of copying it once per patch.
+    # With nothing to patch, content itself is returned untouched.
+    if not spans:
+        return content
+    out = []
+    cur = 0
+    for start, length, new in sorted(spans, key=lambda span: span[0]):
+        if start < cur:
+            raise ValueError(f"Overlapping patches at offset {start}")
+        out.append(content[cur:start])
+        out.append(new)
+        cur = start + length
+    out.append(content[cur:])
+    return b''.join(out)
+
+
+def find_object_literal(content, name):
+    # Locate the object literal of a top-level `const name = {...}` by
+    # matching brackets, stepping over strings and comments. Returns the
+    # offsets of its opening and closing braces and of the last character
+    # of code before the closing brace, or None if there is no such const.
+    match = re.search(rb'^const ' + re.escape(name.encode('utf-8')) + rb' = \{', content, re.M)
+    if match is None:
+        return None
+
+    opening = match.end() - 1
+    depth = 0
+    last = opening
+    i = opening
+    while i < len(content):
+        ch = content[i:i + 1]
+        if ch in b'\'"`':
+            i += 1
+            while i < len(content) and content[i:i + 1] != ch:
+                i += 2 if content[i:i + 1] == b'\\' else 1
+            if i >= len(content):
+                return None
+            last = i
+        elif content[i:i + 2] == b'//':
+            i = content.find(b'\n', i)
+            if i == -1:
+                break
+            continue
+        elif content[i:i + 2] == b'/*':
+            i = content.find(b'*/', i + 2)
+            if i == -1:
+                break
+            i += 2
+            continue
+        elif ch in b'{[(':
+            depth += 1
+        elif ch in b'}])':
+            depth -= 1
+            if depth == 0:
+                return opening, i, last
+        if not ch.isspace():
+            last = i
+        i += 1
+    return None
+
+
+def object_entry_spans(content, name, entry):
+    # Spans that append entry (e.g. "  'Key': value") as the last property of
+    # `const name = {...}`. The new line goes after any trailing comment on
+    # the current last property. Empty if the const is missing or already
+    # has that key.
+    found = find_object_literal(content, name)
+    if found is None:
+        return []
+
+    opening, closing, last = found
+    newline = line_ending(content)
+    key = entry.split(':', 1)[0].strip()
+    if encode(f'\n  {key}:', newline) in content[opening:closing]:
+        return []
+
+    line_end = content.find(b'\n', last, closing)
+    if line_end == -1:
+        line_end = closing
+    elif content[line_end - 1:line_end] == b'\r':
+        line_end -= 1
+    entry = encode(entry, newline)
+    if last == opening:
+        # Empty table: the entry goes straight after the opening brace
+        return [(opening + 1, 0, newline + entry)]
+    if content[last:last + 1] == b',':
+        return [(line_end, 0, newline + entry + b',')]
+    return [(last + 1, 0, b','), (line_end, 0, newline + entry)]
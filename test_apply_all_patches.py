@@ -0,0 +1,110 @@
+import re
+import unittest
+
+import add_methadone
+import fix_layout_and_locales
+import update_app
+from apply_all_patches import STAGES
+from patch_utils import splice
+
+# An untranslated App.jsx in miniature: the per-drug tables, the header
+# buttons and chart legend as they were written, then every literal anchor
+# of the first stage's patches.
+TABLES = """const THERAPEUTIC_RANGES = {
+  'Hydromorphone': {
+    label: 'Analgesia (4.0-15.0)'
+  }
+};
+
+const CLINICAL_DEFAULTS = {
+  'Morphine': { bolus: 5, rate: 2, duration: 120, unit: 'mg' },
+  'Hydromorphone': { bolus: 1, rate: 0.5, duration: 120, unit: 'mg' }
+};
+
+const AVAILABLE_MODELS = {
+  'Morphine': ['Maitre (Adult)', 'McFarlan (Pediatric)'],
+  'Hydromorphone': ['Jeleazcov (2014) Adult', 'Balyan (2020) Pediatric', 'Standard (Adult)', 'Pediatric (Scaled)']
+};"""
+
+HEADER = """          <div className="flex items-center gap-3">
+            <button
+              onClick={() => setShowRanges(!showRanges)}
+              className="text-xs bg-slate-700 hover:bg-slate-600 px-3 py-1.5 rounded flex items-center gap-1"
+            >
+              {showRanges ? <Eye className="w-3 h-3" /> : <EyeOff className="w-3 h-3" />}
+              <span className="hidden sm:inline">Ranges</span>
+            </button>
+            <div className="text-xs bg-red-900/50 text-red-200 px-2 py-1 rounded border border-red-800 hidden sm:block">
+              For Research/Edu Only
+            </div>
+          </div>
+        </div>"""
+
+LEGEND = """<p className="text-xs text-slate-500">
+                実線: 現在のモデル | 点線: 比較対象
+              </p>"""
+
+UNTRANSLATED = '\n\n'.join(
+    [TABLES, HEADER, LEGEND]
+    + [rule['from'] for rule in update_app.rules if rule['kind'] == 'literal']
+    + [patch[0] for patch in add_methadone.PATCHES + fix_layout_and_locales.PATCHES]
+) + '\n'
+
+# The header buttons regex update_app.py used before the block was located
+# by string search
+HEADER_REGEX = re.compile(r'<div className="flex items-center gap-3">\s*<button\s*onClick=\{\(\) => setShowRanges\(!showRanges\)\}\s*className="text-xs bg-slate-700 hover:bg-slate-600 px-3 py-1\.5 rounded flex items-center gap-1"\s*>\s*\{showRanges \? <Eye className="w-3 h-3" /> : <EyeOff className="w-3 h-3" />\}\s*<span className="hidden sm:inline">Ranges</span>\s*</button>\s*<div className="text-xs bg-red-900/50 text-red-200 px-2 py-1 rounded border border-red-800 hidden sm:block">\s*For Research/Edu Only\s*</div>\s*</div>')
+
+# Last entry of each table, which add_methadone.py used to replace together
+# with the closing brace
+TABLE_LAST_ENTRIES = {
+    'THERAPEUTIC_RANGES': "    label: 'Analgesia (4.0-15.0)'\n  }",
+    'CLINICAL_DEFAULTS': "  'Hydromorphone': { bolus: 1, rate: 0.5, duration: 120, unit: 'mg' }",
+    'AVAILABLE_MODELS': "  'Hydromorphone': ['Jeleazcov (2014) Adult', 'Balyan (2020) Pediatric', 'Standard (Adult)', 'Pediatric (Scaled)']",
+}
+
+
+def sequential(content):
+    # The first stage as the scripts ran it before the splice: one
+    # str.replace or re.sub after another, each on the previous one's output.
+    # The rules go in the table's order, where the Compare All tooltip comes
+    # ahead of addToCompare so that it is translated.
+    content = HEADER_REGEX.sub(lambda match: update_app.header_new, content)
+    for rule in update_app.rules:
+        if rule['kind'] == 'literal':
+            content = content.replace(rule['from'], rule['to'])
+        else:
+            content = re.sub(rule['from'], lambda match: rule['to'], content)
+    for name, entry in add_methadone.TABLE_ENTRIES:
+        last = TABLE_LAST_ENTRIES[name]
+        content = content.replace(last + '\n};', last + ',\n' + entry + '\n};')
+    for old, new, *marker in add_methadone.PATCHES + fix_layout_and_locales.PATCHES:
+        content = content.replace(old, new)
+    return content
+
+
+def first_stage(content):
+    spans = []
+    for plan in STAGES[0]:
+        spans += plan(content)
+    return splice(content, spans)
+
+
+class FirstStageTest(unittest.TestCase):
+
+    def test_matches_sequential_replaces(self):
+        expected = sequential(UNTRANSLATED)
+        self.assertNotEqual(expected, UNTRANSLATED)
+        self.assertEqual(first_stage(UNTRANSLATED.encode('utf-8')).decode('utf-8'), expected)
+
+    def test_matches_sequential_replaces_crlf(self):
+        expected = sequential(UNTRANSLATED).replace('\n', '\r\n')
+        content = UNTRANSLATED.replace('\n', '\r\n').encode('utf-8')
+        self.assertEqual(first_stage(content).decode('utf-8'), expected)
+
+    def test_rerun_changes_nothing(self):
+        once = first_stage(UNTRANSLATED.encode('utf-8'))
+        self.assertIs(first_stage(once), once)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import json
+import os
+import tempfile
+import unittest
+
+from locale_utils import update_locale
+
+
+class AppendKeysTest(unittest.TestCase):
+    # update_locale appends new keys by rewriting the end of the file in
+    # place; the result must stay valid JSON whatever trails the last entry.
+
+    def check_append(self, text):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        try:
+            update_locale(path, {'b': '2'})
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(json.loads(f.read()), {'a': '1', 'b': '2'})
+        finally:
+            os.remove(path)
+
+    def test_whitespace_before_closing_brace(self):
+        self.check_append('{"a": "1"' + '\n' * 40 + '}')
+
+    def test_trailing_spaces_after_last_entry(self):
+        self.check_append('{\n    "a": "1"' + ' ' * 60 + '\n}')
+
+    def test_crlf(self):
+        self.check_append('{\r\n    "a": "1"\r\n}\r\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import random
+import unittest
+from unittest import mock
+
+import patch_utils
+from patch_utils import find_object_literal, find_occurrences, find_spans, object_entry_spans, splice
+
+
+def apply(content, patches):
+    return splice(content, find_spans(content, patches))
+
+
+def fallback_occurrences(content, needles):
+    with mock.patch.object(patch_utils, 'ahocorasick', None):
+        return find_occurrences(content, needles)
+
+
+def random_cases():
+    # Short needles over a two-letter alphabet overlap and nest a lot
+    rng = random.Random(0)
+    for _ in range(500):
+        content = bytes(rng.choice(b'ab') for _ in range(16))
+        needles = {bytes(rng.choice(b'ab') for _ in range(rng.randint(1, 3))) for _ in range(rng.randint(1, 4))}
+        yield content, list(needles)
+
+
+class FindOccurrencesTest(unittest.TestCase):
+
+    def test_fallback_reports_every_occurrence(self):
+        for content, needles in random_cases():
+            expected = {
+                needle: [i for i in range(len(content)) if content[i:i + len(needle)] == needle]
+                for needle in needles
+            }
+            self.assertEqual(fallback_occurrences(content, needles), expected)
+
+    @unittest.skipIf(patch_utils.ahocorasick is None, 'pyahocorasick is not installed')
+    def test_backends_agree(self):
+        cases = list(random_cases()) + [('全モデル比較に追加'.encode('utf-8'), ['比較'.encode('utf-8'), '比較に追加'.encode('utf-8')])]
+        for content, needles in cases:
+            expected = fallback_occurrences(content, needles)
+            found = find_occurrences(content, needles)
+            self.assertEqual({needle: sorted(starts) for needle, starts in found.items()}, expected)
+
+
+class FindSpansTest(unittest.TestCase):
+
+    def test_every_occurrence(self):
+        self.assertEqual(apply(b'a-b-a', [('a', 'x')]), b'x-b-x')
+
+    def test_earlier_patch_wins_on_overlap(self):
+        # As if the patches ran as a chain of str.replace calls, in order
+        self.assertEqual(apply(b'xx abc yy', [('bc', 'BC'), ('abc', 'ABC')]), b'xx aBC yy')
+        self.assertEqual(apply(b'xx abc yy', [('abc', 'ABC'), ('bc', 'BC')]), b'xx ABC yy')
+
+    def test_overlapping_occurrences_of_one_anchor(self):
+        self.assertEqual(apply(b'aaaa', [('aa', 'X')]), b'XX')
+        self.assertEqual(apply(b'aaa', [('aa', 'X')]), b'Xa')
+
+    def test_marker_skips_applied_patch(self):
+        self.assertEqual(apply(b'foo DONE', [('foo', 'bar', 'DONE')]), b'foo DONE')
+        self.assertEqual(apply(b'foo', [('foo', 'bar', 'DONE')]), b'bar')
+
+    def test_skipped_patch_does_not_hide_later_anchor(self):
+        patches = [('barbaz', 'Q', 'DONE'), ('baz', 'Z')]
+        self.assertEqual(apply(b'foo barbaz DONE', patches), b'foo barZ DONE')
+
+    def test_insertion_is_its_own_marker(self):
+        # old is part of new, so a second run must not insert again
+        patches = [('a\nb', 'a\nnew\nb')]
+        once = apply(b'a\nb', patches)
+        self.assertEqual(once, b'a\nnew\nb')
+        self.assertEqual(apply(once, patches), once)
+
+    def test_crlf(self):
+        # Patches are written with \n and take on the file's line endings
+        patches = [('a\nb', 'a\nnew\nb')]
+        self.assertEqual(apply(b'a\r\nb\r\n', patches), b'a\r\nnew\r\nb\r\n')
+        self.assertEqual(apply(b'a\nb\r\n', patches), b'a\nnew\nb\r\n')
+
+    def test_utf8(self):
+        self.assertEqual(apply('全モデル比較'.encode('utf-8'), [('比較', "{t('x')}")]), "全モデル{t('x')}".encode('utf-8'))
+
+
+class SpliceTest(unittest.TestCase):
+
+    def test_no_spans_returns_content(self):
+        content = b'abc'
+        self.assertIs(splice(content, []), content)
+
+    def test_spans_in_any_order(self):
+        self.assertEqual(splice(b'abcdef', [(4, 1, b'E'), (0, 0, b'>'), (1, 2, b'')]), b'>adEf')
+
+    def test_overlap_raises(self):
+        with self.assertRaises(ValueError):
+            splice(b'abcdef', [(0, 3, b'x'), (2, 2, b'y')])
+
+
+class ObjectEntryTest(unittest.TestCase):
+
+    def add(self, content):
+        return splice(content, object_entry_spans(content, 'T', "  'M': 2"))
+
+    def test_after_last_entry(self):
+        self.assertEqual(self.add(b"const T = {\n  'A': 1\n};"), b"const T = {\n  'A': 1,\n  'M': 2\n};")
+
+    def test_trailing_comma(self):
+        self.assertEqual(self.add(b"const T = {\n  'A': 1,\n};"), b"const T = {\n  'A': 1,\n  'M': 2,\n};")
+
+    def test_after_trailing_line_comment(self):
+        self.assertEqual(self.add(b"const T = {\n  'A': 1 // a\n};"), b"const T = {\n  'A': 1, // a\n  'M': 2\n};")
+
+    def test_block_comment_after_comma(self):
+        self.assertEqual(self.add(b"const T = {\n  'A': 1, /* last */\n};"), b"const T = {\n  'A': 1, /* last */\n  'M': 2,\n};")
+        self.assertEqual(self.add(b"const T = {\n  'A': 1, /*/ x */\n};"), b"const T = {\n  'A': 1, /*/ x */\n  'M': 2,\n};")
+
+    def test_brackets_in_strings(self):
+        content = b"const T = {\n  'A': '}', 'B': \"\\\"{\"\n};"
+        self.assertEqual(self.add(content), b"const T = {\n  'A': '}', 'B': \"\\\"{\",\n  'M': 2\n};")
+
+    def test_empty_table(self):
+        self.assertEqual(self.add(b"const T = {\n};"), b"const T = {\n  'M': 2\n};")
+        self.assertEqual(self.add(b"const T = {};"), b"const T = {\n  'M': 2};")
+
+    def test_existing_key(self):
+        self.assertEqual(object_entry_spans(b"const T = {\n  'M': 1\n};", 'T', "  'M': 2"), [])
+
+    def test_crlf(self):
+        self.assertEqual(self.add(b"const T = {\r\n  'A': 1\r\n};"), b"const T = {\r\n  'A': 1,\r\n  'M': 2\r\n};")
+
+    def test_unterminated_string(self):
+        self.assertIsNone(find_object_literal(b"const T = {\n  'A': 'oops\n", 'T'))
+
+
+if __name__ == '__main__':
+    unittest.main()
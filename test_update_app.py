@@ -0,0 +1,36 @@
+import unittest
+
+from patch_utils import splice
+from test_apply_all_patches import HEADER
+from update_app import header_buttons_spans, header_new
+
+
+def translate(content):
+    return splice(content, header_buttons_spans(content))
+
+
+class HeaderButtonsTest(unittest.TestCase):
+
+    def test_replaces_block_up_to_its_closing_div(self):
+        # The block ends at the second </div> after the Ranges button: the
+        # research-only note's and then its own, not the enclosing header's
+        content = ('<header>\n' + HEADER + '\n</header>\n').encode('utf-8')
+        expected = '<header>\n          ' + header_new + '\n        </div>\n</header>\n'
+        self.assertEqual(translate(content), expected.encode('utf-8'))
+
+    def test_crlf(self):
+        content = HEADER.replace('\n', '\r\n').encode('utf-8')
+        expected = ('          ' + header_new + '\n        </div>').replace('\n', '\r\n')
+        self.assertEqual(translate(content), expected.encode('utf-8'))
+
+    def test_already_translated(self):
+        content = ('          ' + header_new).encode('utf-8')
+        self.assertEqual(header_buttons_spans(content), [])
+
+    def test_missing_block(self):
+        self.assertEqual(header_buttons_spans(b'<div className="flex items-center gap-3">\n</div>\n'), [])
+        self.assertEqual(header_buttons_spans(HEADER.encode('utf-8').split(b'</div>')[0]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
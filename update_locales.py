@@ -0,0 +1,23 @@
+import fix_layout_and_locales
+import update_locales_realtime
+from locale_utils import update_locales
+
+# Every script's locale keys, in the order the scripts were written.
+# Later groups win on duplicate keys, same as running the scripts in turn.
+LOCALE_GROUPS = [
+    fix_layout_and_locales.LOCALE_KEYS,
+    update_locales_realtime.LOCALE_KEYS,
+]
+
+LOCALE_FILES = ['src/locales/en.json', 'src/locales/ja.json']
+
+if __name__ == '__main__':
+    keys_by_path = {}
+    for path in LOCALE_FILES:
+        keys_by_path[path] = {}
+        for group in LOCALE_GROUPS:
+            keys_by_path[path].update(group.get(path, {}))
+
+    update_locales(keys_by_path)
+
+    print("Updated locale files")